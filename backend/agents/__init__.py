@@ -1,8 +1,15 @@
 """
 Agents package initialization
 """
-from .vision_agent import VisionAgent
-from .context_agent import ContextAgent
-from .command_agent import CommandAgent
+from .vision_agent import VisionAgent, get_vision_agent
+from .context_agent import ContextAgent, get_context_agent
+from .command_agent import CommandAgent, get_command_agent
 
-__all__ = ["VisionAgent", "ContextAgent", "CommandAgent"]
+__all__ = [
+    "VisionAgent",
+    "ContextAgent",
+    "CommandAgent",
+    "get_vision_agent",
+    "get_context_agent",
+    "get_command_agent"
+]
@@ -7,6 +7,7 @@ import asyncio
 import json
 from datetime import datetime
 from typing import Dict, Any, Optional
+from functools import lru_cache
 import sys
 import os
 
@@ -101,6 +102,10 @@ Always be clear, concise, and security-focused. Respond only with valid JSON."""
         # Active tasks tracking
         self.active_tasks: Dict[str, Dict[str, Any]] = {}
 
+        # Tasks with status 'active', rebuilt only when a task starts or
+        # stops. Replaced rather than mutated so readers can hold on to it
+        self.active_tasks_snapshot: Dict[str, Dict[str, Any]] = {}
+
     async def process_command(
         self,
         user_command: str,
@@ -151,6 +156,7 @@ Always be clear, concise, and security-focused. Respond only with valid JSON."""
                 "created_at": datetime.utcnow(),
                 "results": []
             }
+            self._refresh_active_tasks()
 
             return parsed_command
 
@@ -297,18 +303,36 @@ Respond with JSON:
         if task_id in self.active_tasks:
             self.active_tasks[task_id]['status'] = 'stopped'
             self.active_tasks[task_id]['stopped_at'] = datetime.utcnow()
+            self._refresh_active_tasks()
             return True
         return False
 
-    def get_active_tasks(self) -> Dict[str, Dict[str, Any]]:
+    def _refresh_active_tasks(self):
         """
-        Get all active tasks
-
-        Returns:
-            Dictionary of active tasks
+        Rebuild the active task snapshot after a task starts or stops
         """
-        return {
+        self.active_tasks_snapshot = {
             task_id: task
             for task_id, task in self.active_tasks.items()
             if task['status'] == 'active'
         }
+
+    def get_active_tasks(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get all active tasks
+
+        Returns:
+            Dictionary of active tasks; treat as read-only
+        """
+        return self.active_tasks_snapshot
+
+
+@lru_cache(maxsize=1)
+def get_command_agent() -> CommandAgent:
+    """
+    Get the shared Command Agent instance, creating it on first use
+
+    Returns:
+        CommandAgent instance
+    """
+    return CommandAgent()
@@ -3,11 +3,20 @@ Context Agent - Manages historical context, pattern recognition, and anomaly det
 Uses ChromaDB for semantic search of past events
 """
 import chromadb
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
 from chromadb.config import Settings as ChromaSettings
 from chromadb.utils import embedding_functions
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import hashlib
 import json
+import sqlite3
+import threading
+import numpy as np
+from functools import lru_cache
+from loguru import logger
 import sys
 import os
 
@@ -17,6 +26,165 @@ from config import settings
 from database.models import Event, ContextPattern, AlertSeverity
 
 
+# Embeddings kept in memory on top of the on-disk cache
+EMBEDDING_CACHE_MEMORY_SIZE = 1024
+
+# Embeddings kept on disk; the oldest rows are pruned beyond this
+EMBEDDING_CACHE_DISK_SIZE = 50000
+
+# How often new embeddings are written to disk, and how many pending
+# embeddings trigger an early write
+EMBEDDING_CACHE_FLUSH_SECONDS = 2.0
+EMBEDDING_CACHE_FLUSH_SIZE = 256
+
+# HNSW index settings for new collections; cosine matches the
+# "similarity = 1 - distance" reading used by the queries below
+HNSW_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 64
+}
+
+
+class CachedEmbeddingFunction(EmbeddingFunction):
+    """
+    Embedding function wrapper with an in-memory LRU and a SQLite disk cache
+
+    Static cameras produce the same scene descriptions over and over, so
+    texts are keyed by SHA-256 and only misses reach the wrapped model.
+    New vectors are written to disk by a background thread, so callers on
+    the event loop never wait on a commit.
+    """
+
+    def __init__(self, embedding_function: EmbeddingFunction, cache_path: str):
+        """
+        Initialize the cache
+
+        Args:
+            embedding_function: Embedding function to wrap
+            cache_path: SQLite file for cached vectors
+        """
+        self.embedding_function = embedding_function
+        self._cache_path = cache_path
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+
+        # Vectors computed but not written to disk yet
+        self._pending: Dict[str, bytes] = {}
+
+        # Chroma calls this from the event loop and from worker threads
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(cache_path, check_same_thread=False)
+        # WAL lets the writer thread commit while lookups read
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (hash TEXT PRIMARY KEY, vec BLOB NOT NULL)"
+        )
+        self._db.commit()
+
+        self._flush_event = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="embedding-cache", daemon=True)
+        self._writer.start()
+
+    def _remember(self, key: str, vector: List[float]):
+        """
+        Add a vector to the in-memory LRU
+
+        Args:
+            key: Text hash
+            vector: Embedding vector
+        """
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > EMBEDDING_CACHE_MEMORY_SIZE:
+            self._memory.popitem(last=False)
+
+    def _write_loop(self):
+        """
+        Write pending vectors to disk and prune the oldest rows
+
+        Runs on the cache's writer thread with its own connection.
+        """
+        db = sqlite3.connect(self._cache_path)
+        while True:
+            self._flush_event.wait(EMBEDDING_CACHE_FLUSH_SECONDS)
+            self._flush_event.clear()
+
+            with self._lock:
+                rows = list(self._pending.items())
+            if not rows:
+                continue
+
+            try:
+                db.executemany("INSERT OR REPLACE INTO embeddings (hash, vec) VALUES (?, ?)", rows)
+                db.execute(
+                    "DELETE FROM embeddings WHERE rowid <= (SELECT MAX(rowid) FROM embeddings) - ?",
+                    (EMBEDDING_CACHE_DISK_SIZE,)
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                db.rollback()
+                logger.warning("Error writing embedding cache: {}", e)
+                continue
+
+            with self._lock:
+                for key, _ in rows:
+                    self._pending.pop(key, None)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        """
+        Embed texts, computing only those not cached yet
+
+        Args:
+            input: Texts to embed
+
+        Returns:
+            One embedding per text
+        """
+        keys = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in input]
+        vectors: Dict[str, List[float]] = {}
+
+        with self._lock:
+            # Memory tier, including vectors not written to disk yet
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    vectors[key] = self._memory[key]
+                elif key in self._pending:
+                    vectors[key] = np.frombuffer(self._pending[key], dtype=np.float32).tolist()
+
+            # Disk tier
+            missing = list({key for key in keys if key not in vectors})
+            if missing:
+                rows = self._db.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE hash IN ({','.join('?' * len(missing))})",
+                    missing
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                    vectors[key] = vector
+                    self._remember(key, vector)
+
+        # Compute the rest outside the lock
+        pending = {}
+        for key, text in zip(keys, input):
+            if key not in vectors and key not in pending:
+                pending[key] = text
+
+        if pending:
+            computed = self.embedding_function(list(pending.values()))
+            with self._lock:
+                for key, vector in zip(pending, computed):
+                    self._pending[key] = np.asarray(vector, dtype=np.float32).tobytes()
+                    vector = list(vector)
+                    vectors[key] = vector
+                    self._remember(key, vector)
+                if len(self._pending) >= EMBEDDING_CACHE_FLUSH_SIZE:
+                    self._flush_event.set()
+
+        return [vectors[key] for key in keys]
+
+
 class ContextAgent:
     """
     Manages context building, pattern recognition, and anomaly detection
@@ -41,24 +209,69 @@ class ContextAgent:
             )
         )
 
-        # Use sentence-transformers for embeddings
-        self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
+        # Use sentence-transformers for embeddings, cached by text
+        self.embedding_function = CachedEmbeddingFunction(
+            embedding_functions.SentenceTransformerEmbeddingFunction(
+                model_name="all-MiniLM-L6-v2"
+            ),
+            os.path.join(persist_dir, "embedding_cache.sqlite3")
         )
 
         # Create or get collections
         self.scene_collection = self.client.get_or_create_collection(
             name="scene_descriptions",
             embedding_function=self.embedding_function,
-            metadata={"description": "Scene descriptions from Gemini"}
+            metadata={"description": "Scene descriptions from Gemini", **HNSW_METADATA}
         )
 
         self.pattern_collection = self.client.get_or_create_collection(
             name="behavior_patterns",
             embedding_function=self.embedding_function,
-            metadata={"description": "Learned behavior patterns"}
+            metadata={"description": "Learned behavior patterns", **HNSW_METADATA}
         )
 
+    @staticmethod
+    def make_embedding_id(event_id: int, timestamp: datetime) -> str:
+        """
+        Build the embedding ID a scene description is stored under
+
+        Args:
+            event_id: Event ID
+            timestamp: Event timestamp
+
+        Returns:
+            Embedding ID
+        """
+        return f"event_{event_id}_{timestamp.isoformat()}"
+
+    @staticmethod
+    def _scene_metadata(
+        event_id: int,
+        camera_id: int,
+        timestamp: datetime,
+        metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Build the stored metadata for a scene description
+
+        Args:
+            event_id: Event ID
+            camera_id: Camera ID
+            timestamp: Event timestamp
+            metadata: Additional metadata
+
+        Returns:
+            Metadata dictionary
+        """
+        return {
+            "event_id": event_id,
+            "camera_id": camera_id,
+            "timestamp": timestamp.isoformat(),
+            "hour_of_day": timestamp.hour,
+            "day_of_week": timestamp.weekday(),
+            **metadata
+        }
+
     async def store_scene_description(
         self,
         event_id: int,
@@ -80,26 +293,44 @@ class ContextAgent:
         Returns:
             Embedding ID
         """
-        embedding_id = f"event_{event_id}_{timestamp.isoformat()}"
+        embedding_ids = await self.store_scene_descriptions_batch([
+            (event_id, camera_id, timestamp, scene_description, metadata)
+        ])
+        return embedding_ids[0]
 
-        # Prepare metadata
-        meta = {
-            "event_id": event_id,
-            "camera_id": camera_id,
-            "timestamp": timestamp.isoformat(),
-            "hour_of_day": timestamp.hour,
-            "day_of_week": timestamp.weekday(),
-            **metadata
-        }
+    async def store_scene_descriptions_batch(
+        self,
+        items: List[Tuple[int, int, datetime, str, Dict[str, Any]]]
+    ) -> List[str]:
+        """
+        Store several scene descriptions with one embedding and insert call
 
-        # Add to collection
-        self.scene_collection.add(
-            documents=[scene_description],
-            ids=[embedding_id],
-            metadatas=[meta]
+        Args:
+            items: (event_id, camera_id, timestamp, scene_description, metadata) tuples
+
+        Returns:
+            Embedding IDs, in the same order as items
+        """
+        if not items:
+            return []
+
+        embedding_ids = [
+            self.make_embedding_id(event_id, timestamp)
+            for event_id, _, timestamp, _, _ in items
+        ]
+
+        # Embedding and HNSW insert are blocking; keep them off the event loop
+        await asyncio.to_thread(
+            self.scene_collection.add,
+            documents=[scene_description for _, _, _, scene_description, _ in items],
+            ids=embedding_ids,
+            metadatas=[
+                self._scene_metadata(event_id, camera_id, timestamp, metadata)
+                for event_id, camera_id, timestamp, _, metadata in items
+            ]
         )
 
-        return embedding_id
+        return embedding_ids
 
     async def find_similar_events(
         self,
@@ -409,3 +640,14 @@ class ContextAgent:
                 "patterns": pattern_count
             }
         }
+
+
+@lru_cache(maxsize=1)
+def get_context_agent() -> ContextAgent:
+    """
+    Get the shared Context Agent instance, creating it on first use
+
+    Returns:
+        ContextAgent instance
+    """
+    return ContextAgent()
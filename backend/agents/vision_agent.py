@@ -4,21 +4,22 @@ Vision Agent - Handles Gemini Live API integration for real-time video analysis
 import google.generativeai as genai
 from google.generativeai.types import GenerationConfig, HarmCategory, HarmBlockThreshold
 import asyncio
-import base64
 import json
+import orjson
 from datetime import datetime
 from typing import Dict, Any, List, Optional, AsyncGenerator
 import cv2
 import numpy as np
-from PIL import Image
 import io
+from functools import lru_cache
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config import settings
+from config import settings, RUNTIME
 from database.models import AlertSeverity
+from services import camera_service
 
 
 class VisionAgent:
@@ -106,20 +107,13 @@ Focus on security-relevant events and anomalies. Be concise but thorough."""
             Analysis results
         """
         try:
-            # Convert frame to PIL Image
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(frame_rgb)
-
             # Build prompt with context
             prompt = self.system_prompt
             if previous_context:
                 prompt += f"\n\nPrevious context: {previous_context}"
 
-            # Generate analysis
-            response = await asyncio.to_thread(
-                self.model.generate_content,
-                [prompt, pil_image]
-            )
+            # Convert and generate analysis off the event loop
+            response = await asyncio.to_thread(self._generate_for_frame, prompt, frame)
 
             # Parse response
             analysis = self._parse_gemini_response(response.text)
@@ -139,6 +133,27 @@ Focus on security-relevant events and anomalies. Be concise but thorough."""
                 "alerts": []
             }
 
+    def _generate_for_frame(self, prompt: str, frame: np.ndarray):
+        """
+        Encode a BGR frame as JPEG and send it to Gemini
+
+        The BGR frame goes straight to the JPEG encoder, skipping the
+        RGB conversion and the lossless PIL re-encode in the SDK.
+        Blocking; runs in a worker thread.
+
+        Args:
+            prompt: Analysis prompt
+            frame: Video frame (numpy array)
+
+        Returns:
+            Gemini response
+        """
+        image = {
+            "mime_type": "image/jpeg",
+            "data": camera_service.encode_jpeg(frame, quality=RUNTIME.ANALYSIS_JPEG_QUALITY)
+        }
+        return self.model.generate_content([prompt, image])
+
     def _parse_gemini_response(self, response_text: str) -> Dict[str, Any]:
         """
         Parse Gemini's response into structured format
@@ -165,7 +180,7 @@ Focus on security-relevant events and anomalies. Be concise but thorough."""
             text = text.strip()
 
             # Parse JSON
-            analysis = json.loads(text)
+            analysis = orjson.loads(text)
 
             # Ensure required fields
             if 'scene_description' not in analysis:
@@ -261,17 +276,23 @@ Focus on security-relevant events and anomalies. Be concise but thorough."""
         total_score = min(base_score + detection_boost + alert_boost, 100)
         return total_score
 
-    def determine_alert_severity(self, analysis: Dict[str, Any]) -> AlertSeverity:
+    def determine_alert_severity(
+        self,
+        analysis: Dict[str, Any],
+        significance: Optional[int] = None
+    ) -> AlertSeverity:
         """
         Determine alert severity based on analysis
 
         Args:
             analysis: Analysis results
+            significance: Precomputed significance score, if already known
 
         Returns:
             Alert severity
         """
-        significance = self.calculate_significance_score(analysis)
+        if significance is None:
+            significance = self.calculate_significance_score(analysis)
         alerts = analysis.get('alerts', [])
 
         # Check for critical alerts
@@ -280,9 +301,9 @@ Focus on security-relevant events and anomalies. Be concise but thorough."""
                 return AlertSeverity.CRITICAL
 
         # Check significance thresholds
-        if significance >= settings.CRITICAL_THRESHOLD:
+        if significance >= RUNTIME.CRITICAL_THRESHOLD:
             return AlertSeverity.CRITICAL
-        elif significance >= settings.WARNING_THRESHOLD:
+        elif significance >= RUNTIME.WARNING_THRESHOLD:
             return AlertSeverity.WARNING
         else:
             return AlertSeverity.INFO
@@ -348,3 +369,14 @@ Focus on security-relevant events and anomalies. Be concise but thorough."""
             })
 
         return detections
+
+
+@lru_cache(maxsize=1)
+def get_vision_agent() -> VisionAgent:
+    """
+    Get the shared Vision Agent instance, creating it on first use
+
+    Returns:
+        VisionAgent instance
+    """
+    return VisionAgent()
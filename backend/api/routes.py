@@ -2,20 +2,24 @@
 API routes for SentinTinel Surveillance System
 """
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, func, select, Select
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional, Iterator
 from datetime import datetime, timedelta
-import base64
+import asyncio
 import cv2
 import numpy as np
+import orjson
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_db, Camera, Event, Detection, Alert, ContextPattern, AlertSeverity
+from database import get_db, stream_query, Camera, Event, Detection, Alert, ContextPattern, AlertSeverity
 from api.websocket import manager
-from agents import VisionAgent, ContextAgent, CommandAgent
+from agents import get_context_agent, get_command_agent
 from services import camera_service
 from config import settings
 
@@ -23,11 +27,14 @@ from config import settings
 router = APIRouter()
 ws_router = APIRouter()
 
-# Initialize agents
-vision_agent = VisionAgent()
-context_agent = ContextAgent()
-command_agent = CommandAgent()
-
+# Command task types that start a monitoring task
+MONITORING_TASK_TYPES = frozenset({
+    'object_detection',
+    'surveillance',
+    'scene_analysis',
+    'anomaly_detection',
+    'tracking'
+})
 
 # WebSocket endpoints
 @ws_router.websocket("/ws/live-feed")
@@ -61,12 +68,7 @@ async def websocket_alerts(websocket: WebSocket):
     WebSocket endpoint for real-time alerts
     """
     await manager.connect(websocket, "alerts")
-
-    try:
-        while True:
-            await websocket.receive_text()  # Keep connection alive
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
+    await manager.wait_for_disconnect(websocket)
 
 
 @ws_router.websocket("/ws/analysis")
@@ -75,12 +77,7 @@ async def websocket_analysis(websocket: WebSocket):
     WebSocket endpoint for scene analysis/narration
     """
     await manager.connect(websocket, "analysis")
-
-    try:
-        while True:
-            await websocket.receive_text()  # Keep connection alive
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
+    await manager.wait_for_disconnect(websocket)
 
 
 @ws_router.websocket("/ws/system")
@@ -108,7 +105,7 @@ async def get_cameras(db: Session = Depends(get_db)):
     """
     Get all cameras
     """
-    cameras = db.query(Camera).all()
+    cameras = await asyncio.to_thread(db.query(Camera).all)
     return cameras
 
 
@@ -130,8 +127,8 @@ async def create_camera(
     )
 
     db.add(camera)
-    db.commit()
-    db.refresh(camera)
+    await asyncio.to_thread(db.commit)
+    await asyncio.to_thread(db.refresh, camera)
 
     return camera
 
@@ -141,7 +138,7 @@ async def start_camera(camera_id: int, db: Session = Depends(get_db)):
     """
     Start a camera feed
     """
-    camera = db.query(Camera).filter(Camera.id == camera_id).first()
+    camera = await asyncio.to_thread(db.query(Camera).filter(Camera.id == camera_id).first)
 
     if not camera:
         raise HTTPException(status_code=404, detail="Camera not found")
@@ -155,7 +152,7 @@ async def start_camera(camera_id: int, db: Session = Depends(get_db)):
 
     if success:
         camera.is_active = True
-        db.commit()
+        await asyncio.to_thread(db.commit)
         return {"status": "started", "camera_id": camera_id}
     else:
         raise HTTPException(status_code=500, detail="Failed to start camera")
@@ -166,14 +163,14 @@ async def stop_camera(camera_id: int, db: Session = Depends(get_db)):
     """
     Stop a camera feed
     """
-    camera = db.query(Camera).filter(Camera.id == camera_id).first()
+    camera = await asyncio.to_thread(db.query(Camera).filter(Camera.id == camera_id).first)
 
     if not camera:
         raise HTTPException(status_code=404, detail="Camera not found")
 
     await camera_service.stop_camera(camera_id)
     camera.is_active = False
-    db.commit()
+    await asyncio.to_thread(db.commit)
 
     return {"status": "stopped", "camera_id": camera_id}
 
@@ -185,10 +182,13 @@ async def get_events(
     end_date: Optional[datetime] = None,
     severity: Optional[AlertSeverity] = None,
     limit: int = 100,
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
     """
     Get events with filtering
+
+    Pass stream=true to receive the rows as NDJSON instead of a JSON array
     """
     query = db.query(Event)
 
@@ -201,7 +201,12 @@ async def get_events(
     if severity:
         query = query.filter(Event.severity == severity)
 
-    events = query.order_by(Event.timestamp.desc()).limit(limit).all()
+    query = query.order_by(Event.timestamp.desc()).limit(limit)
+
+    if stream:
+        return StreamingResponse(_iter_ndjson(db, query.statement), media_type="application/x-ndjson")
+
+    events = await asyncio.to_thread(query.all)
     return events
 
 
@@ -210,10 +215,13 @@ async def get_alerts(
     is_read: Optional[bool] = None,
     severity: Optional[AlertSeverity] = None,
     limit: int = 50,
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
     """
     Get alerts with filtering
+
+    Pass stream=true to receive the rows as NDJSON instead of a JSON array
     """
     query = db.query(Alert)
 
@@ -222,7 +230,12 @@ async def get_alerts(
     if severity:
         query = query.filter(Alert.severity == severity)
 
-    alerts = query.order_by(Alert.timestamp.desc()).limit(limit).all()
+    query = query.order_by(Alert.timestamp.desc()).limit(limit)
+
+    if stream:
+        return StreamingResponse(_iter_ndjson(db, query.statement), media_type="application/x-ndjson")
+
+    alerts = await asyncio.to_thread(query.all)
     return alerts
 
 
@@ -231,7 +244,9 @@ async def acknowledge_alert(alert_id: int, db: Session = Depends(get_db)):
     """
     Acknowledge an alert
     """
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = await asyncio.to_thread(
+        db.query(Alert).options(joinedload(Alert.event)).filter(Alert.id == alert_id).first
+    )
 
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
@@ -243,7 +258,8 @@ async def acknowledge_alert(alert_id: int, db: Session = Depends(get_db)):
         response_time = (alert.acknowledged_at - alert.event.timestamp).total_seconds()
         alert.response_time_seconds = int(response_time)
 
-    db.commit()
+    await asyncio.to_thread(db.commit)
+    await asyncio.to_thread(db.refresh, alert)
 
     return alert
 
@@ -258,29 +274,29 @@ async def get_summary_stats(
     """
     since = datetime.utcnow() - timedelta(hours=hours)
 
-    total_events = db.query(Event).filter(Event.timestamp >= since).count()
-    critical_alerts = db.query(Alert).filter(
-        Alert.timestamp >= since,
-        Alert.severity == AlertSeverity.CRITICAL
-    ).count()
-    warning_alerts = db.query(Alert).filter(
-        Alert.timestamp >= since,
-        Alert.severity == AlertSeverity.WARNING
-    ).count()
-
-    # Average response time
-    acknowledged_alerts = db.query(Alert).filter(
-        Alert.timestamp >= since,
-        Alert.acknowledged_at.isnot(None)
-    ).all()
-
-    avg_response_time = 0
-    if acknowledged_alerts:
-        total_response = sum(a.response_time_seconds for a in acknowledged_alerts if a.response_time_seconds)
-        avg_response_time = total_response / len(acknowledged_alerts) if acknowledged_alerts else 0
+    # Event count, per-severity alert counts and average response time
+    # in a single round trip
+    total_events = (
+        select(func.count(Event.id))
+        .where(Event.timestamp >= since)
+        .scalar_subquery()
+    )
+    stats = await asyncio.to_thread(db.query(
+        total_events.label("total_events"),
+        func.count(case((Alert.severity == AlertSeverity.CRITICAL, 1))).label("critical_alerts"),
+        func.count(case((Alert.severity == AlertSeverity.WARNING, 1))).label("warning_alerts"),
+        func.avg(case(
+            (Alert.acknowledged_at.isnot(None), Alert.response_time_seconds)
+        )).label("avg_response_time")
+    ).filter(Alert.timestamp >= since).one)
+
+    total_events = stats.total_events
+    critical_alerts = stats.critical_alerts
+    warning_alerts = stats.warning_alerts
+    avg_response_time = stats.avg_response_time or 0
 
     # Get ChromaDB stats
-    chroma_stats = context_agent.get_statistics()
+    chroma_stats = get_context_agent().get_statistics()
 
     return {
         "period_hours": hours,
@@ -304,10 +320,10 @@ async def get_patterns(
     """
     query = db.query(ContextPattern).filter(ContextPattern.is_active == True)
 
-    patterns_db = query.order_by(ContextPattern.frequency.desc()).limit(20).all()
+    patterns_db = await asyncio.to_thread(query.order_by(ContextPattern.frequency.desc()).limit(20).all)
 
     # Also get patterns from context agent
-    patterns_chroma = await context_agent.identify_patterns(camera_id=camera_id)
+    patterns_chroma = await get_context_agent().identify_patterns(camera_id=camera_id)
 
     return {
         "database_patterns": patterns_db,
@@ -332,6 +348,25 @@ async def health_check():
 
 
 # Helper functions
+def _iter_ndjson(db: Session, stmt: Select, batch_size: int = 100) -> Iterator[bytes]:
+    """
+    Serialize query rows as newline-delimited JSON, fetching in batches
+
+    StreamingResponse iterates sync generators in a threadpool, so the
+    blocking fetches stay off the event loop.
+
+    Args:
+        db: Database session
+        stmt: Select statement to stream
+        batch_size: Rows fetched per round trip
+
+    Yields:
+        One encoded JSON line per row
+    """
+    for row in stream_query(db, stmt, yield_per=batch_size):
+        yield orjson.dumps(jsonable_encoder(row)) + b"\n"
+
+
 async def handle_system_command(command: str, params: dict):
     """
     Handle system commands from WebSocket
@@ -363,14 +398,14 @@ async def process_user_command(command: str, params: dict):
     """
     try:
         # Get current context
-        active_camera_ids = list(camera_service.active_cameras.keys())
+        _, active_camera_ids = camera_service.get_snapshot()
         context = {
-            "active_cameras": active_camera_ids,
+            "active_cameras": list(active_camera_ids),
             "timestamp": datetime.utcnow().isoformat()
         }
 
         # Process command with CommandAgent
-        result = await command_agent.process_command(command, context)
+        result = await get_command_agent().process_command(command, context)
 
         # Send confirmation to user
         await manager.send_system_message("command_processed", {
@@ -385,7 +420,7 @@ async def process_user_command(command: str, params: dict):
         # Execute task based on type
         task_type = result.get('task_type')
 
-        if task_type in ['object_detection', 'surveillance', 'scene_analysis', 'anomaly_detection', 'tracking']:
+        if task_type in MONITORING_TASK_TYPES:
             # Start monitoring task
             await start_monitoring_task(result)
 
@@ -417,7 +452,7 @@ async def start_monitoring_task(task_command: dict):
 
     # Determine which cameras to monitor
     if camera_ids == ['all'] or 'all' in camera_ids:
-        target_cameras = list(camera_service.active_cameras.keys())
+        _, target_cameras = camera_service.get_snapshot()
     else:
         target_cameras = [int(cid) for cid in camera_ids if isinstance(cid, (int, str))]
 
@@ -2,15 +2,53 @@
 WebSocket handlers for real-time communication
 """
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List, Set
-import json
+from typing import Dict, Iterable, List, Optional, Set, Union
+from contextlib import suppress
 import asyncio
-from datetime import datetime
+import msgpack
+import orjson
+import time
+from datetime import date, datetime
 import sys
 import os
+from loguru import logger
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Connection types that receive msgpack binary frames instead of JSON text
+MSGPACK_CONNECTION_TYPES = {"live_feed"}
+
+# Messages sent within the same window share one formatted timestamp
+TIMESTAMP_RESOLUTION_SECONDS = 0.1
+
+# Broadcast sends slower than this drop the client instead of stalling the sender
+SEND_TIMEOUT_SECONDS = 1.0
+
+# Close code telling dropped clients to reconnect later (Try Again Later)
+DROPPED_CLOSE_CODE = 1013
+
+# Redis pub/sub channel that relays broadcasts between worker processes
+FANOUT_CHANNEL = "surveillance"
+
+# Backoff between attempts to resubscribe after losing Redis
+FANOUT_RETRY_MIN_SECONDS = 0.5
+FANOUT_RETRY_MAX_SECONDS = 30.0
+
+
+def _msgpack_default(obj):
+    """
+    Convert values msgpack cannot pack the way orjson serializes them
+
+    Keeps msgpack payloads accepting the same messages as the JSON path:
+    datetimes become ISO strings, numpy scalars and arrays become Python
+    numbers and lists.
+    """
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
 
 class ConnectionManager:
     """
@@ -29,6 +67,30 @@ class ConnectionManager:
         # Connection metadata
         self.connection_info: Dict[WebSocket, Dict] = {}
 
+        # Cached (tick, ISO timestamp) for outgoing messages
+        self._timestamp_cache = (-1, "")
+
+        # Redis client and listener task when broadcasts are relayed
+        # between worker processes
+        self._redis = None
+        self._fanout_task: Optional[asyncio.Task] = None
+
+        # Whether this worker is subscribed to the fan-out channel; while
+        # it is not, broadcasts are delivered locally instead
+        self._fanout_ready = False
+
+    def _now_iso(self) -> str:
+        """
+        Get the current UTC time as an ISO string, reused within a tick
+
+        Returns:
+            ISO formatted timestamp
+        """
+        tick = int(time.monotonic() / TIMESTAMP_RESOLUTION_SECONDS)
+        if tick != self._timestamp_cache[0]:
+            self._timestamp_cache = (tick, datetime.utcnow().isoformat())
+        return self._timestamp_cache[1]
+
     async def connect(self, websocket: WebSocket, connection_type: str = "system"):
         """
         Accept and register a new WebSocket connection
@@ -53,7 +115,7 @@ class ConnectionManager:
         await self.send_personal_message({
             "type": "connection_established",
             "connection_type": connection_type,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._now_iso(),
             "message": f"Connected to {connection_type} stream"
         }, websocket)
 
@@ -69,8 +131,162 @@ class ConnectionManager:
             conn_set.discard(websocket)
 
         # Remove metadata
-        if websocket in self.connection_info:
-            del self.connection_info[websocket]
+        self.connection_info.pop(websocket, None)
+
+    async def wait_for_disconnect(self, websocket: WebSocket):
+        """
+        Hold a push-only connection open until the client disconnects
+
+        Args:
+            websocket: WebSocket connection
+        """
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+        finally:
+            self.disconnect(websocket)
+
+    def has_subscribers(self, connection_type: str) -> bool:
+        """
+        Check whether any client is connected to a stream type
+
+        While the Redis fan-out is relaying, clients of other workers are
+        not visible here, so every stream is assumed to have subscribers.
+
+        Args:
+            connection_type: Type of connection (live_feed, alerts, analysis, system)
+
+        Returns:
+            True if at least one connection of that type is open
+        """
+        if self._fanout_ready:
+            return True
+        return bool(self.active_connections.get(connection_type))
+
+    async def start_fanout(self, redis_url: str):
+        """
+        Relay broadcasts through Redis pub/sub
+
+        Every worker publishes its broadcasts to one channel and forwards
+        everything it receives on that channel to its own connections.
+
+        Args:
+            redis_url: Redis connection URL
+        """
+        import redis.asyncio as aioredis
+
+        self._redis = aioredis.from_url(redis_url)
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(FANOUT_CHANNEL)
+        self._fanout_ready = True
+        self._fanout_task = asyncio.create_task(self._fanout_listener(pubsub))
+        logger.info("WebSocket fan-out subscribed to Redis channel {}", FANOUT_CHANNEL)
+
+    async def stop_fanout(self):
+        """
+        Stop relaying broadcasts through Redis
+        """
+        if self._fanout_task is not None:
+            # Let the listener close its pubsub before the client goes
+            self._fanout_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._fanout_task
+            self._fanout_task = None
+        self._fanout_ready = False
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def _fanout_listener(self, pubsub):
+        """
+        Forward broadcasts published by any worker to local connections
+
+        If the Redis connection drops, broadcasts fall back to local
+        delivery and the channel is resubscribed with backoff.
+
+        Args:
+            pubsub: Subscribed Redis PubSub
+        """
+        retry_delay = FANOUT_RETRY_MIN_SECONDS
+        try:
+            while True:
+                try:
+                    async for item in pubsub.listen():
+                        retry_delay = FANOUT_RETRY_MIN_SECONDS
+                        if item["type"] != "message":
+                            continue
+                        try:
+                            envelope = msgpack.unpackb(item["data"], raw=False)
+                            await self._broadcast_local(envelope["message"], envelope["types"])
+                        except Exception as e:
+                            logger.warning("Error relaying broadcast: {}", e)
+                except Exception as e:
+                    logger.error("Lost Redis fan-out subscription, delivering locally: {}", e)
+
+                # Resubscribe until Redis is back
+                self._fanout_ready = False
+                while True:
+                    with suppress(Exception):
+                        await pubsub.aclose()
+                    await asyncio.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, FANOUT_RETRY_MAX_SECONDS)
+                    try:
+                        pubsub = self._redis.pubsub()
+                        await pubsub.subscribe(FANOUT_CHANNEL)
+                        break
+                    except Exception as e:
+                        logger.warning("Redis fan-out resubscribe failed: {}", e)
+
+                self._fanout_ready = True
+                logger.info("WebSocket fan-out resubscribed to Redis channel {}", FANOUT_CHANNEL)
+        finally:
+            self._fanout_ready = False
+            with suppress(Exception):
+                await pubsub.aclose()
+
+    @staticmethod
+    def _encode(message: dict, connection_type: str) -> Union[bytes, str]:
+        """
+        Serialize a message in the wire format of a connection type
+
+        Args:
+            message: Message dictionary
+            connection_type: Type of the receiving connections
+
+        Returns:
+            msgpack bytes for binary connection types, JSON text otherwise
+        """
+        if connection_type in MSGPACK_CONNECTION_TYPES:
+            return msgpack.packb(message, use_bin_type=True, default=_msgpack_default)
+        return orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+    @staticmethod
+    async def _send_payload(websocket: WebSocket, payload: Union[bytes, str]):
+        """
+        Send an already serialized payload
+
+        Args:
+            websocket: Target WebSocket
+            payload: Output of _encode
+        """
+        if isinstance(payload, bytes):
+            await websocket.send_bytes(payload)
+        else:
+            await websocket.send_text(payload)
+
+    async def _send(self, websocket: WebSocket, message: dict):
+        """
+        Send a message using the wire format of the connection's type
+
+        Args:
+            websocket: Target WebSocket
+            message: Message dictionary
+        """
+        info = self.connection_info.get(websocket)
+        connection_type = info["type"] if info is not None else "system"
+        await self._send_payload(websocket, self._encode(message, connection_type))
 
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """
@@ -81,14 +297,16 @@ class ConnectionManager:
             websocket: Target WebSocket
         """
         try:
-            await websocket.send_json(message)
+            await self._send(websocket, message)
 
-            if websocket in self.connection_info:
-                self.connection_info[websocket]["messages_sent"] += 1
+            info = self.connection_info.get(websocket)
+            if info is not None:
+                info["messages_sent"] += 1
 
         except Exception as e:
-            print(f"Error sending message: {e}")
+            logger.warning("Error sending message: {}", e)
             self.disconnect(websocket)
+            await self._close_dropped([websocket])
 
     async def broadcast(self, message: dict, connection_type: str = None):
         """
@@ -99,43 +317,128 @@ class ConnectionManager:
             connection_type: Type of connections to broadcast to (None for all)
         """
         if connection_type and connection_type in self.active_connections:
-            connections = self.active_connections[connection_type]
+            await self.broadcast_to_types(message, [connection_type])
         else:
             # Broadcast to all
-            connections = set()
-            for conn_set in self.active_connections.values():
-                connections.update(conn_set)
+            await self.broadcast_to_types(message, list(self.active_connections))
 
-        # Send to all connections
-        disconnected = []
-        for connection in connections:
-            try:
-                await connection.send_json(message)
+    async def broadcast_to_types(self, message: dict, connection_types: List[str]):
+        """
+        Broadcast one message to several connection types at once
 
-                if connection in self.connection_info:
-                    self.connection_info[connection]["messages_sent"] += 1
+        While the Redis fan-out is relaying, the message is published once
+        and each worker delivers it to its own connections.
 
+        Args:
+            message: Message dictionary
+            connection_types: Types of connections to broadcast to
+        """
+        if self._fanout_ready:
+            envelope = msgpack.packb(
+                {"types": connection_types, "message": message},
+                use_bin_type=True,
+                default=_msgpack_default
+            )
+            try:
+                await self._redis.publish(FANOUT_CHANNEL, envelope)
+                return
             except Exception as e:
-                print(f"Error broadcasting to connection: {e}")
-                disconnected.append(connection)
+                logger.warning("Redis fan-out publish failed, delivering locally: {}", e)
+
+        await self._broadcast_local(message, connection_types)
+
+    async def _broadcast_local(self, message: dict, connection_types: List[str]):
+        """
+        Broadcast one message to this worker's connections of several types
+
+        The message is serialized once per wire format and the same payload
+        is reused for every receiving connection.
 
-        # Clean up disconnected
-        for connection in disconnected:
-            self.disconnect(connection)
+        Args:
+            message: Message dictionary
+            connection_types: Types of connections to broadcast to
+        """
+        payloads: Dict[bool, Union[bytes, str]] = {}
+        targets = []
+        for conn_type in connection_types:
+            connections = self.active_connections.get(conn_type)
+            if not connections:
+                continue
+
+            binary = conn_type in MSGPACK_CONNECTION_TYPES
+            if binary not in payloads:
+                payloads[binary] = self._encode(message, conn_type)
+            targets.extend((connection, payloads[binary]) for connection in connections)
+
+        if not targets:
+            return
+
+        # Send to all connections concurrently, bounding each slow client
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(self._send_payload(connection, payload), timeout=SEND_TIMEOUT_SECONDS)
+                for connection, payload in targets
+            ),
+            return_exceptions=True
+        )
+
+        disconnected = set()
+        for (connection, _), result in zip(targets, results):
+            if isinstance(result, asyncio.TimeoutError):
+                logger.warning("Dropping connection that did not accept a broadcast in time")
+                disconnected.add(connection)
+            elif isinstance(result, Exception):
+                logger.warning("Error broadcasting to connection: {}", result)
+                disconnected.add(connection)
+            else:
+                info = self.connection_info.get(connection)
+                if info is not None:
+                    info["messages_sent"] += 1
+
+        # Clean up disconnected in one pass per connection type
+        if disconnected:
+            for conn_set in self.active_connections.values():
+                conn_set -= disconnected
+            for connection in disconnected:
+                self.connection_info.pop(connection, None)
+            await self._close_dropped(disconnected)
+
+    @staticmethod
+    async def _close_dropped(connections: Iterable[WebSocket]):
+        """
+        Close connections dropped after a failed or slow send
 
-    async def send_live_feed_update(self, camera_id: int, frame_data: str, analysis: dict):
+        A dropped socket may have been cut off mid-frame, so it is closed
+        to end its endpoint and make the client reconnect.
+
+        Args:
+            connections: Connections already removed from the manager
+        """
+        async def close(connection: WebSocket):
+            with suppress(Exception):
+                await asyncio.wait_for(
+                    connection.close(code=DROPPED_CLOSE_CODE),
+                    timeout=SEND_TIMEOUT_SECONDS
+                )
+
+        await asyncio.gather(*(close(connection) for connection in connections))
+
+    async def send_live_feed_update(self, camera_id: int, frame_data: bytes, analysis: dict):
         """
         Send live feed update to subscribed clients
 
+        The live feed channel is msgpack-encoded, so the JPEG travels as raw
+        binary instead of base64 text.
+
         Args:
             camera_id: Camera ID
-            frame_data: Base64 encoded frame
+            frame_data: JPEG encoded frame
             analysis: Analysis results
         """
         message = {
             "type": "live_feed_update",
             "camera_id": camera_id,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._now_iso(),
             "frame": frame_data,
             "analysis": analysis
         }
@@ -151,12 +454,12 @@ class ConnectionManager:
         """
         message = {
             "type": "alert",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._now_iso(),
             "alert": alert
         }
 
-        await self.broadcast(message, "alerts")
-        await self.broadcast(message, "system")  # Also send to system connections
+        # Also send to system connections
+        await self.broadcast_to_types(message, ["alerts", "system"])
 
     async def send_analysis_update(self, analysis: dict):
         """
@@ -167,7 +470,7 @@ class ConnectionManager:
         """
         message = {
             "type": "analysis_update",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._now_iso(),
             "analysis": analysis
         }
 
@@ -183,7 +486,7 @@ class ConnectionManager:
         """
         message = {
             "type": message_type,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._now_iso(),
             "data": data
         }
 
@@ -2,6 +2,8 @@
 Configuration management for SentinTinel Surveillance System
 """
 from pydantic_settings import BaseSettings
+from functools import lru_cache
+from types import SimpleNamespace
 from typing import Optional
 
 
@@ -18,6 +20,12 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "sentintinel_db"
     POSTGRES_USER: str = "sentintinel_user"
     POSTGRES_PASSWORD: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 3600
+    DB_WRITE_QUEUE_SIZE: int = 1000  # Queued events before the oldest is dropped for new ones
+    DB_WRITE_BATCH_SIZE: int = 50  # Events stored per writer transaction
 
     # Redis Configuration
     REDIS_HOST: str = "localhost"
@@ -35,6 +43,9 @@ class Settings(BaseSettings):
     APP_PORT: int = 8000
     DEBUG: bool = True
     LOG_LEVEL: str = "INFO"
+    WORKERS: int = 1  # Each worker process runs its own surveillance worker
+    WS_PER_MESSAGE_DEFLATE: bool = True  # Compress WebSocket messages when clients support it
+    WS_REDIS_FANOUT: bool = False  # Relay broadcasts through Redis so every worker's clients get them
 
     # Security
     SECRET_KEY: str
@@ -43,8 +54,17 @@ class Settings(BaseSettings):
     # Camera Configuration
     CAMERA_FPS: int = 2
     MAX_CAMERAS: int = 4
+    MAX_CONCURRENT_CAMERAS: int = 4  # Cameras analyzed at once by the worker
     VIDEO_RESOLUTION_WIDTH: int = 1280
     VIDEO_RESOLUTION_HEIGHT: int = 720
+    ANALYSIS_WIDTH: int = 768
+    ANALYSIS_HEIGHT: int = 432
+    ANALYSIS_JPEG_QUALITY: int = 90
+    PREVIEW_WIDTH: int = 640
+    PREVIEW_HEIGHT: int = 360
+    PREVIEW_JPEG_QUALITY: int = 70
+    SCENE_CHANGE_THRESHOLD: int = 5  # dHash bits that must differ to re-analyze
+    ANALYSIS_CACHE_TTL_SECONDS: float = 5.0  # Re-analyze unchanged scenes after this long
 
     # Alert Thresholds
     CRITICAL_THRESHOLD: int = 80
@@ -72,5 +92,21 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Get the application settings, parsing .env and validating only once
+
+    Also usable as a FastAPI dependency: Depends(get_settings)
+
+    Returns:
+        Settings instance
+    """
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
+
+# Plain attribute snapshot of settings for per-frame reads in hot paths
+RUNTIME = SimpleNamespace(**settings.model_dump())
@@ -12,7 +12,7 @@ from .models import (
     AlertSeverity,
     DetectionStatus
 )
-from .database import get_db, init_db, engine, SessionLocal
+from .database import get_db, get_async_db, stream_query, init_db, maintain_partitions, engine, SessionLocal, AsyncSessionLocal
 
 __all__ = [
     "Base",
@@ -25,7 +25,11 @@ __all__ = [
     "AlertSeverity",
     "DetectionStatus",
     "get_db",
+    "get_async_db",
+    "stream_query",
     "init_db",
+    "maintain_partitions",
     "engine",
-    "SessionLocal"
+    "SessionLocal",
+    "AsyncSessionLocal"
 ]
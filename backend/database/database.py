@@ -1,10 +1,13 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text, Select
+from sqlalchemy.engine import Connection, ScalarResult
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from datetime import date, datetime
 from typing import Generator, AsyncGenerator
+from loguru import logger
 import sys
 import os
 
@@ -20,8 +23,10 @@ engine = create_engine(
     settings.database_url,
     echo=settings.DEBUG,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE
 )
 
 # Async engine
@@ -29,8 +34,10 @@ async_engine = create_async_engine(
     settings.async_database_url,
     echo=settings.DEBUG,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE
 )
 
 # Session factories
@@ -52,6 +59,10 @@ def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
+    except Exception:
+        # Return the connection to the pool in a clean state
+        db.rollback()
+        raise
     finally:
         db.close()
 
@@ -70,12 +81,153 @@ async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def stream_query(db: Session, stmt: Select, yield_per: int = 500) -> ScalarResult:
+    """
+    Execute a select and stream its rows in batches
+
+    Rows come from a server-side cursor yield_per at a time instead of
+    being materialized into one list, so memory stays flat for large
+    historical fetches.
+
+    Args:
+        db: Database session
+        stmt: Select statement
+        yield_per: Rows fetched per batch
+
+    Returns:
+        Scalar result iterating over the selected entities
+    """
+    return db.execute(stmt.execution_options(yield_per=yield_per)).scalars()
+
+
+def _month_start(day: date, offset: int = 0) -> date:
+    """
+    Get the first day of the month offset months after day's month
+
+    Args:
+        day: Any day in the base month
+        offset: Number of months to move forward
+
+    Returns:
+        First day of the resulting month
+    """
+    month_index = day.month - 1 + offset
+    return date(day.year + month_index // 12, month_index % 12 + 1, 1)
+
+
+def _create_month_partition(conn: Connection, table_name: str, start: date) -> None:
+    """
+    Create the partition holding one month of a range-partitioned table
+
+    Args:
+        conn: Database connection
+        table_name: Partitioned parent table
+        start: First day of the month
+    """
+    end = _month_start(start, 1)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {table_name}_{start:%Y_%m} "
+        f"PARTITION OF {table_name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+
+
+def create_time_partitions(conn: Connection, months_ahead: int = 2) -> None:
+    """
+    Create monthly partitions for tables partitioned by timestamp range
+
+    Creates partitions for the current month and the next months_ahead
+    months; existing partitions are left untouched. There is no default
+    partition, so this has to keep running ahead of the clock (see
+    maintain_partitions).
+
+    Tables created before partitioning are plain tables and cannot get
+    partitions attached; they are skipped with a warning and need a
+    manual migration.
+
+    Args:
+        conn: Database connection
+        months_ahead: Number of future months to create
+    """
+    if conn.dialect.name != "postgresql":
+        return
+
+    # Rows hold naive UTC timestamps, so months follow the UTC date
+    this_month = _month_start(datetime.utcnow().date())
+    months = [_month_start(this_month, offset) for offset in range(months_ahead + 1)]
+
+    partitioned = set(conn.execute(text(
+        "SELECT c.relname FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid"
+    )).scalars())
+
+    for table in Base.metadata.sorted_tables:
+        if not table.dialect_options["postgresql"].get("partition_by"):
+            continue
+
+        if table.name not in partitioned:
+            logger.warning(
+                "Table {} is not partitioned; recreate it as partitioned by timestamp "
+                "to enable monthly partitions",
+                table.name
+            )
+            continue
+
+        for start in months:
+            _create_month_partition(conn, table.name, start)
+
+
+def ensure_column_defaults(conn: Connection) -> None:
+    """
+    Set the model's server-side column defaults on existing tables
+
+    create_all does not alter existing tables, so tables created while
+    defaults were applied client-side have no database defaults and
+    would store NULL timestamps. Setting a default is idempotent.
+
+    Args:
+        conn: Database connection
+    """
+    if conn.dialect.name != "postgresql":
+        return
+
+    existing = set(conn.execute(text(
+        "SELECT tablename FROM pg_tables WHERE schemaname = current_schema()"
+    )).scalars())
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        for column in table.columns:
+            if column.server_default is None:
+                continue
+            default = column.server_default.arg.compile(
+                dialect=conn.dialect,
+                compile_kwargs={"literal_binds": True}
+            )
+            conn.execute(text(
+                f"ALTER TABLE {table.name} ALTER COLUMN {column.name} SET DEFAULT {default}"
+            ))
+
+
+def maintain_partitions() -> None:
+    """
+    Create upcoming monthly partitions
+
+    Blocking; run periodically so inserts never outrun the partitions.
+    """
+    with engine.begin() as conn:
+        create_time_partitions(conn)
+
+
 def init_db() -> None:
     """
     Initialize database tables
     Creates all tables defined in models
     """
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        ensure_column_defaults(conn)
+    maintain_partitions()
     print("Database tables created successfully")
 
 
@@ -85,4 +237,6 @@ async def init_async_db() -> None:
     """
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(ensure_column_defaults)
+        await conn.run_sync(create_time_partitions)
     print("Database tables created successfully (async)")
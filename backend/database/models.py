@@ -1,15 +1,19 @@
 """
 Database models for SentinTinel Surveillance System
 """
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Enum as SQLEnum, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Enum as SQLEnum, Text, Boolean, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 import enum
 
 
 Base = declarative_base()
 
+# Current UTC time evaluated by Postgres; columns are naive UTC timestamps
+utc_now = func.timezone("utc", func.now())
+
 
 class AlertSeverity(str, enum.Enum):
     """Alert severity levels"""
@@ -39,13 +43,17 @@ class Camera(Base):
     fps = Column(Integer, default=2)
     resolution_width = Column(Integer, default=1280)
     resolution_height = Column(Integer, default=720)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now)
+    updated_at = Column(DateTime, server_default=utc_now, onupdate=utc_now)
 
     # Relationships
     events = relationship("Event", back_populates="camera", cascade="all, delete-orphan")
     detections = relationship("Detection", back_populates="camera", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        UniqueConstraint("name", name="uq_cameras_name"),
+    )
+
 
 class Event(Base):
     """Surveillance events and incidents"""
@@ -53,33 +61,43 @@ class Event(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     camera_id = Column(Integer, ForeignKey("cameras.id"), nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    timestamp = Column(DateTime, server_default=utc_now)
     event_type = Column(String(100))
     description = Column(Text)
     scene_description = Column(Text)  # Gemini's scene analysis
     significance_score = Column(Integer, default=0)  # 0-100
     severity = Column(SQLEnum(AlertSeverity), default=AlertSeverity.INFO)
-    event_metadata = Column(JSON)  # Additional event data
+    event_metadata = Column(JSONB)  # Additional event data (Gemini analysis)
     embedding_id = Column(String(255), index=True)  # ChromaDB reference
     context_summary = Column(Text)  # Historical context from ChromaDB
     is_anomaly = Column(Boolean, default=False)
     is_dismissed = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now)
 
     # Relationships
     camera = relationship("Camera", back_populates="events")
     detections = relationship("Detection", back_populates="event", cascade="all, delete-orphan")
     alerts = relationship("Alert", back_populates="event", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_events_timestamp_camera_id", "timestamp", "camera_id"),
+        Index("ix_events_camera_id_timestamp", "camera_id", "timestamp"),
+        Index("ix_events_event_metadata", "event_metadata", postgresql_using="gin"),
+    )
+
+    # Fetch server-generated columns in the INSERT instead of on next access
+    __mapper_args__ = {"eager_defaults": True}
+
 
 class Detection(Base):
     """Object and person detections from Gemini"""
     __tablename__ = "detections"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # Range-partitioned by timestamp, so the partition key is part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
     camera_id = Column(Integer, ForeignKey("cameras.id"), nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    timestamp = Column(DateTime, primary_key=True, server_default=utc_now, index=True)
     object_type = Column(String(100))  # person, vehicle, package, etc.
     object_label = Column(String(255))
     confidence_score = Column(Float)
@@ -92,6 +110,13 @@ class Detection(Base):
     event = relationship("Event", back_populates="detections")
     camera = relationship("Camera", back_populates="detections")
 
+    __table_args__ = (
+        Index("ix_detections_camera_id_timestamp", "camera_id", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+    __mapper_args__ = {"eager_defaults": True}
+
 
 class Alert(Base):
     """Alert notifications generated from events"""
@@ -102,7 +127,7 @@ class Alert(Base):
     severity = Column(SQLEnum(AlertSeverity), nullable=False)
     title = Column(String(255), nullable=False)
     message = Column(Text, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    timestamp = Column(DateTime, server_default=utc_now)
     is_read = Column(Boolean, default=False)
     is_dismissed = Column(Boolean, default=False)
     acknowledged_at = Column(DateTime, nullable=True)
@@ -112,6 +137,14 @@ class Alert(Base):
     # Relationships
     event = relationship("Event", back_populates="alerts")
 
+    __table_args__ = (
+        Index("ix_alerts_timestamp_severity", "timestamp", "severity"),
+        Index("ix_alerts_timestamp_acknowledged_at", "timestamp", "acknowledged_at"),
+        Index("ix_alerts_event_id_severity", "event_id", "severity"),
+    )
+
+    __mapper_args__ = {"eager_defaults": True}
+
 
 class ContextPattern(Base):
     """Learned patterns and routines from historical data"""
@@ -127,8 +160,8 @@ class ContextPattern(Base):
     time_range_end = Column(DateTime, nullable=True)
     pattern_metadata = Column(JSON)
     embedding_ids = Column(JSON)  # Related ChromaDB embeddings
-    created_at = Column(DateTime, default=datetime.utcnow)
-    last_seen = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now)
+    last_seen = Column(DateTime, server_default=utc_now)
     is_active = Column(Boolean, default=True)
 
 
@@ -136,10 +169,15 @@ class SystemLog(Base):
     """System activity and performance logs"""
     __tablename__ = "system_logs"
 
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    # Range-partitioned by timestamp, so the partition key is part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    timestamp = Column(DateTime, primary_key=True, server_default=utc_now, index=True)
     log_level = Column(String(20))  # DEBUG, INFO, WARNING, ERROR, CRITICAL
     component = Column(String(100))  # vision_agent, context_agent, api, etc.
     message = Column(Text)
     log_metadata = Column(JSON)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now)
+
+    __table_args__ = (
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
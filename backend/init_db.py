@@ -3,53 +3,71 @@ Database initialization script
 Creates tables and sample data
 """
 import sys
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from database import init_db, SessionLocal, Camera
 
 
+def ensure_camera_name_unique(db: Session):
+    """
+    Add the unique camera name constraint to tables created without it
+
+    create_all does not alter existing tables, and the sample camera
+    insert needs the constraint for ON CONFLICT (name).
+    """
+    exists = db.execute(text(
+        "SELECT 1 FROM pg_constraint WHERE conname = 'uq_cameras_name'"
+    )).scalar()
+    if not exists:
+        db.execute(text("ALTER TABLE cameras ADD CONSTRAINT uq_cameras_name UNIQUE (name)"))
+        db.commit()
+        print("✓ Added unique constraint on camera names")
+
+
 def create_sample_cameras(db: Session):
     """
     Create sample cameras for testing
     """
     cameras = [
-        Camera(
-            name="Front Entrance",
-            location="Building A - Main Door",
-            stream_url="0",  # Webcam
-            is_active=False,
-            fps=2
-        ),
-        Camera(
-            name="Parking Lot",
-            location="South Parking Area",
-            stream_url="1",
-            is_active=False,
-            fps=2
-        ),
-        Camera(
-            name="Lobby Camera",
-            location="Main Lobby",
-            stream_url="2",
-            is_active=False,
-            fps=2
-        ),
-        Camera(
-            name="Back Entrance",
-            location="Building A - Service Door",
-            stream_url="3",
-            is_active=False,
-            fps=2
-        )
+        {
+            "name": "Front Entrance",
+            "location": "Building A - Main Door",
+            "stream_url": "0",  # Webcam
+            "is_active": False,
+            "fps": 2
+        },
+        {
+            "name": "Parking Lot",
+            "location": "South Parking Area",
+            "stream_url": "1",
+            "is_active": False,
+            "fps": 2
+        },
+        {
+            "name": "Lobby Camera",
+            "location": "Main Lobby",
+            "stream_url": "2",
+            "is_active": False,
+            "fps": 2
+        },
+        {
+            "name": "Back Entrance",
+            "location": "Building A - Service Door",
+            "stream_url": "3",
+            "is_active": False,
+            "fps": 2
+        }
     ]
 
-    for camera in cameras:
-        existing = db.query(Camera).filter(Camera.name == camera.name).first()
-        if not existing:
-            db.add(camera)
+    ensure_camera_name_unique(db)
 
+    # Insert all cameras in one statement, skipping names that already exist
+    stmt = insert(Camera).values(cameras).on_conflict_do_nothing(index_elements=["name"])
+    result = db.execute(stmt)
     db.commit()
-    print(f"Created {len(cameras)} sample cameras")
+    print(f"Created {result.rowcount} sample cameras")
 
 
 def main():
@@ -3,17 +3,24 @@ Main FastAPI application for SentinTinel Surveillance System
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 import asyncio
+import sys
+import time
 import uvicorn
 from loguru import logger
 
-from config import settings
-from database import init_db
-from api import router, ws_router
+from config import settings, RUNTIME
+from database import init_db, maintain_partitions
+from api import router, ws_router, manager
 from services import camera_service
 
+# Log through a background queue so sinks never block the event loop
+logger.remove()
+logger.add(sys.stderr, level=settings.LOG_LEVEL, enqueue=True)
+
 
 # Startup and shutdown events
 @asynccontextmanager
@@ -28,16 +35,44 @@ async def lifespan(app: FastAPI):
     init_db()
     logger.info("Database initialized")
 
+    # Share WebSocket broadcasts across worker processes
+    if settings.WS_REDIS_FANOUT:
+        await manager.start_fanout(settings.redis_url)
+
     # Start background tasks
-    asyncio.create_task(surveillance_worker())
+    maintenance_task = asyncio.create_task(partition_maintenance())
+    writer_task = asyncio.create_task(database_writer())
+    worker_task = asyncio.create_task(surveillance_worker())
     logger.info("Surveillance worker started")
 
     yield
 
     # Shutdown
     logger.info("Shutting down...")
+
+    # Stop producing events, then let the writer store what is queued
+    await cancel_task(worker_task)
     await camera_service.stop_all_cameras()
     logger.info("All cameras stopped")
+    try:
+        await asyncio.wait_for(db_write_queue.join(), timeout=DB_WRITE_DRAIN_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Dropped {} queued events on shutdown", db_write_queue.qsize())
+    await cancel_task(writer_task)
+    await cancel_task(maintenance_task)
+
+    # Nothing schedules OpenCV work any more
+    camera_service.shutdown_executor()
+    await manager.stop_fanout()
+
+
+async def cancel_task(task: asyncio.Task):
+    """
+    Cancel a background task and wait for it to finish
+    """
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
 
 
 # Create FastAPI app
@@ -45,7 +80,8 @@ app = FastAPI(
     title="SentinTinel Surveillance API",
     description="AI-powered surveillance system with Gemini integration",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -84,176 +120,379 @@ async def health():
     return {"status": "healthy"}
 
 
+# How often the surveillance worker checks for started cameras
+CAMERA_POLL_INTERVAL_SECONDS = 0.5
+
+# How often upcoming monthly table partitions are created
+PARTITION_MAINTENANCE_INTERVAL_SECONDS = 24 * 60 * 60
+
+# How long shutdown waits for queued events to be stored
+DB_WRITE_DRAIN_TIMEOUT_SECONDS = 10.0
+
+# Surveillance writes waiting for the database writer
+db_write_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.DB_WRITE_QUEUE_SIZE)
+
+
+def queue_db_write(item: dict):
+    """
+    Queue a write for the database writer without waiting
+
+    When the writer falls behind, the oldest pending write is dropped
+    so camera processing never blocks on persistence.
+    """
+    if db_write_queue.full():
+        db_write_queue.get_nowait()
+        db_write_queue.task_done()
+        logger.warning("Database write queue full, dropped oldest event")
+    db_write_queue.put_nowait(item)
+
+
+# Background task keeping monthly partitions ahead of the clock
+async def partition_maintenance():
+    """
+    Background task that creates upcoming monthly partitions once a day
+    """
+    while True:
+        await asyncio.sleep(PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(maintain_partitions)
+        except Exception as e:
+            logger.error("Error creating partitions: {}", e)
+
+
+# Background writer for surveillance events
+async def database_writer():
+    """
+    Background task that stores queued events in batched transactions
+    """
+    from agents import get_context_agent
+    from api import manager
+    from database import AsyncSessionLocal, Event, Detection, Alert, AlertSeverity
+
+    context_agent = get_context_agent()
+
+    async def store_events(items: list):
+        """
+        Store queued events with their detections and alerts in one transaction
+
+        Returns:
+            (alert messages, scene items) to publish once committed
+        """
+        async with AsyncSessionLocal() as db, db.begin():
+            events = [
+                Event(
+                    camera_id=item["camera_id"],
+                    timestamp=item["timestamp"],
+                    event_type="scene_analysis",
+                    description=item["analysis"].get('activity', ''),
+                    scene_description=item["scene_description"],
+                    significance_score=item["significance_score"],
+                    severity=item["severity"],
+                    context_summary=item["context_summary"],
+                    event_metadata=item["analysis"]
+                )
+                for item in items
+            ]
+            db.add_all(events)
+            await db.flush()  # Get event IDs
+
+            detection_mappings = []
+            task_alert_mappings = []
+            alerts = []
+            scene_items = []
+            for item, event in zip(items, events):
+                event.embedding_id = context_agent.make_embedding_id(event.id, event.timestamp)
+                scene_items.append((
+                    event.id,
+                    event.camera_id,
+                    event.timestamp,
+                    event.scene_description,
+                    {"significance": event.significance_score}
+                ))
+
+                # Create detections
+                detection_mappings.extend(
+                    {
+                        "event_id": event.id,
+                        "camera_id": event.camera_id,
+                        "timestamp": item["timestamp"],
+                        **det
+                    }
+                    for det in item["detections"]
+                )
+
+                # Create task alerts
+                task_alert_mappings.extend(
+                    {
+                        "event_id": event.id,
+                        "severity": AlertSeverity.WARNING,
+                        "title": title,
+                        "message": message
+                    }
+                    for title, message in item["task_alerts"]
+                )
+
+                # Create alert if significant
+                if event.significance_score >= RUNTIME.WARNING_THRESHOLD:
+                    alerts.append((
+                        event.camera_id,
+                        Alert(
+                            event_id=event.id,
+                            severity=event.severity,
+                            title=f"{event.severity.value} Alert - Camera {event.camera_id}",
+                            message=event.scene_description
+                        )
+                    ))
+
+            def insert_mappings(session):
+                session.bulk_insert_mappings(Detection, detection_mappings)
+                session.bulk_insert_mappings(Alert, task_alert_mappings)
+
+            await db.run_sync(insert_mappings)
+
+            db.add_all([alert for _, alert in alerts])
+            await db.flush()  # Get alert IDs
+
+            alert_messages = [
+                {
+                    "id": alert.id,
+                    "severity": alert.severity.value,
+                    "title": alert.title,
+                    "message": alert.message,
+                    "camera_id": camera_id,
+                    "timestamp": alert.timestamp.isoformat() if alert.timestamp else None
+                }
+                for camera_id, alert in alerts
+            ]
+
+        return alert_messages, scene_items
+
+    logger.info("Database writer started")
+
+    while True:
+        # Wait for one write, then take whatever else is already queued
+        items = [await db_write_queue.get()]
+        while len(items) < RUNTIME.DB_WRITE_BATCH_SIZE and not db_write_queue.empty():
+            items.append(db_write_queue.get_nowait())
+
+        try:
+            # Store the batch in one transaction; if it fails, retry event
+            # by event so one bad row does not discard the rest
+            try:
+                stored = [await store_events(items)]
+            except Exception as e:
+                logger.error("Error storing {} events, retrying one at a time: {}", len(items), e)
+                stored = []
+                for item in items:
+                    try:
+                        stored.append(await store_events([item]))
+                    except Exception as item_error:
+                        logger.error("Dropping event from camera {}: {}", item["camera_id"], item_error)
+
+            # Send alerts via WebSocket
+            await asyncio.gather(*(
+                manager.send_alert(message)
+                for alert_messages, _ in stored
+                for message in alert_messages
+            ))
+
+            # Store scene descriptions in ChromaDB in one batch
+            scene_items = [scene for _, scenes in stored for scene in scenes]
+            if scene_items:
+                await context_agent.store_scene_descriptions_batch(scene_items)
+
+        except Exception as e:
+            logger.error("Error publishing stored events: {}", e)
+
+        finally:
+            for _ in items:
+                db_write_queue.task_done()
+
+
 # Background worker for surveillance processing
 async def surveillance_worker():
     """
     Background worker that processes camera feeds
     """
-    from agents import VisionAgent, ContextAgent, CommandAgent
+    from agents import get_vision_agent, get_context_agent, get_command_agent
     from api import manager
-    from database import SessionLocal, Event, Detection, Alert, AlertSeverity
-    from datetime import datetime
-    import base64
-    import cv2
-
-    vision_agent = VisionAgent()
-    context_agent = ContextAgent()
-    command_agent = CommandAgent()
+    from datetime import datetime, timezone
+
+    vision_agent = get_vision_agent()
+    context_agent = get_context_agent()
+    command_agent = get_command_agent()
+
+    camera_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_CAMERAS)
+
+    # (dHash, analysis, monotonic time) of the last analyzed frame per camera
+    last_analysis = {}
+
+    async def process_camera(camera_id: int, frame, active_tasks: dict):
+        """
+        Analyze, queue for storage and broadcast one frame from a camera
+        """
+        async with camera_semaphore:
+            # Downscale once for hashing, analysis and the preview. Reuse
+            # the last analysis while the scene is unchanged and it is
+            # still fresh, but keep the live feed moving
+            frame, frame_hash = await camera_service.run_blocking(camera_service.prepare_for_analysis, frame)
+            cached = last_analysis.get(camera_id)
+            if (
+                cached is not None
+                and (frame_hash ^ cached[0]).bit_count() < RUNTIME.SCENE_CHANGE_THRESHOLD
+                and time.monotonic() - cached[2] < RUNTIME.ANALYSIS_CACHE_TTL_SECONDS
+            ):
+                if manager.has_subscribers("live_feed"):
+                    frame_jpeg = await camera_service.run_blocking(camera_service.encode_preview, frame)
+                    await manager.send_live_feed_update(camera_id, frame_jpeg, cached[1])
+                return
+
+            # One timestamp for everything derived from this frame. Columns
+            # are naive UTC, so drop the tzinfo after reading the clock
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            now_iso = now.isoformat()
+
+            # Analyze frame with Vision Agent
+            analysis = await vision_agent.analyze_frame(frame, camera_id)
+            analysis['timestamp'] = now_iso
+            last_analysis[camera_id] = (frame_hash, analysis, time.monotonic())
+
+            scene_description = analysis.get('scene_description', '')
+
+            # Get context from Context Agent
+            context_summary = await context_agent.get_context_for_event(
+                scene_description,
+                now,
+                camera_id
+            )
+
+            # Check active tasks and analyze in context
+            task_alerts = []
+            for task_id, task_data in active_tasks.items():
+                task_command = task_data.get('command', {})
+                task_params = task_command.get('parameters', {})
+                target_cameras = task_params.get('camera_ids', ['all'])
+
+                # Check if this camera is relevant to the task
+                if target_cameras == ['all'] or 'all' in target_cameras or camera_id in target_cameras:
+                    # Analyze in context of task
+                    task_result = await command_agent.analyze_with_context(
+                        task_id,
+                        {"camera_id": camera_id, "timestamp": now_iso},
+                        analysis
+                    )
+
+                    if task_result.get('alert_needed'):
+                        task_alerts.append((task_id, task_command, task_result))
+
+            # Queue the event, detections and alerts for the database
+            # writer; the alert broadcast follows its commit
+            significance_score = vision_agent.calculate_significance_score(analysis)
+            queue_db_write({
+                "camera_id": camera_id,
+                "timestamp": now,
+                "analysis": analysis,
+                "scene_description": scene_description,
+                "significance_score": significance_score,
+                "severity": vision_agent.determine_alert_severity(analysis, significance_score),
+                "context_summary": context_summary,
+                "detections": vision_agent.extract_detections_for_storage(analysis),
+                "task_alerts": [
+                    (
+                        f"Task Alert: {task_command.get('target', 'Unknown')}",
+                        task_result.get('alert_message', 'Task condition met')
+                    )
+                    for _, task_command, task_result in task_alerts
+                ]
+            })
+
+            # Fan out all WebSocket updates for this frame concurrently
+            updates = []
+
+            # Send live feed update via WebSocket, encoding the preview
+            # once for every live feed client and only if there is one
+            if manager.has_subscribers("live_feed"):
+                frame_jpeg = await camera_service.run_blocking(camera_service.encode_preview, frame)
+                updates.append(manager.send_live_feed_update(
+                    camera_id,
+                    frame_jpeg,
+                    analysis
+                ))
+
+            # Send analysis update
+            if manager.has_subscribers("analysis"):
+                updates.append(manager.send_analysis_update({
+                    "camera_id": camera_id,
+                    "scene_description": scene_description,
+                    "significance": significance_score,
+                    "detections": len(analysis.get('detections', [])),
+                    "context": context_summary
+                }))
+
+            # Send task updates
+            if manager.has_subscribers("system"):
+                for task_id, task_command, task_result in task_alerts:
+                    updates.append(manager.send_system_message("task_alert", {
+                        "task_id": task_id,
+                        "camera_id": camera_id,
+                        "task_type": task_command.get('task_type'),
+                        "target": task_command.get('target'),
+                        "findings": task_result.get('findings'),
+                        "alert_message": task_result.get('alert_message'),
+                        "timestamp": now_iso
+                    }))
+
+            if updates:
+                await asyncio.gather(*updates)
+
+    async def camera_loop(camera_id: int):
+        """
+        Process a camera's frames as they arrive until it is stopped
+
+        Only the latest frame is picked up after each one is processed,
+        so a camera that falls behind skips frames instead of lagging.
+        """
+        frame_seq = 0
+        while True:
+            frame_seq, frame = await camera_service.wait_for_frame(camera_id, frame_seq)
+            if frame is None:
+                return
+
+            try:
+                await process_camera(camera_id, frame, command_agent.active_tasks_snapshot)
+            except Exception as e:
+                logger.error("Error processing camera {}: {}", camera_id, e)
 
     logger.info("Surveillance worker started")
 
-    while True:
-        try:
-            # Get active cameras
-            active_camera_count = camera_service.get_active_camera_count()
-
-            if active_camera_count > 0:
-                # Process each active camera
-                for camera_id in list(camera_service.active_cameras.keys()):
-                    # Capture frame
-                    frame = await camera_service.capture_frame(camera_id)
-
-                    if frame is not None:
-                        # Analyze frame with Vision Agent
-                        analysis = await vision_agent.analyze_frame(frame, camera_id)
-
-                        # Get context from Context Agent
-                        context_summary = await context_agent.get_context_for_event(
-                            analysis.get('scene_description', ''),
-                            datetime.utcnow(),
-                            camera_id
-                        )
+    # One frame loop per active camera
+    camera_loops = {}
 
-                        # Store event in database
-                        db = SessionLocal()
-                        try:
-                            # Create event
-                            event = Event(
-                                camera_id=camera_id,
-                                event_type="scene_analysis",
-                                description=analysis.get('activity', ''),
-                                scene_description=analysis.get('scene_description', ''),
-                                significance_score=vision_agent.calculate_significance_score(analysis),
-                                severity=vision_agent.determine_alert_severity(analysis),
-                                context_summary=context_summary,
-                                event_metadata=analysis
-                            )
-
-                            db.add(event)
-                            db.flush()  # Get event ID
-
-                            # Store in ChromaDB
-                            embedding_id = await context_agent.store_scene_description(
-                                event.id,
-                                camera_id,
-                                event.timestamp,
-                                event.scene_description,
-                                {"significance": event.significance_score}
-                            )
-
-                            event.embedding_id = embedding_id
-
-                            # Create detections
-                            for det in vision_agent.extract_detections_for_storage(analysis):
-                                detection = Detection(
-                                    event_id=event.id,
-                                    camera_id=camera_id,
-                                    **det
-                                )
-                                db.add(detection)
-
-                            # Create alert if significant
-                            if event.significance_score >= settings.WARNING_THRESHOLD:
-                                alert = Alert(
-                                    event_id=event.id,
-                                    severity=event.severity,
-                                    title=f"{event.severity.value} Alert - Camera {camera_id}",
-                                    message=event.scene_description
-                                )
-                                db.add(alert)
-                                db.flush()
-
-                                # Send alert via WebSocket
-                                await manager.send_alert({
-                                    "id": alert.id,
-                                    "severity": alert.severity.value,
-                                    "title": alert.title,
-                                    "message": alert.message,
-                                    "camera_id": camera_id,
-                                    "timestamp": alert.timestamp.isoformat()
-                                })
-
-                            db.commit()
-
-                            # Send live feed update via WebSocket
-                            _, buffer = cv2.imencode('.jpg', frame)
-                            frame_base64 = base64.b64encode(buffer).decode('utf-8')
-
-                            await manager.send_live_feed_update(
-                                camera_id,
-                                frame_base64,
-                                analysis
-                            )
-
-                            # Send analysis update
-                            await manager.send_analysis_update({
-                                "camera_id": camera_id,
-                                "scene_description": analysis.get('scene_description', ''),
-                                "significance": event.significance_score,
-                                "detections": len(analysis.get('detections', [])),
-                                "context": context_summary
-                            })
-
-                            # Check active tasks and analyze in context
-                            active_tasks = command_agent.get_active_tasks()
-                            for task_id, task_data in active_tasks.items():
-                                task_command = task_data.get('command', {})
-                                task_params = task_command.get('parameters', {})
-                                target_cameras = task_params.get('camera_ids', ['all'])
-
-                                # Check if this camera is relevant to the task
-                                if target_cameras == ['all'] or 'all' in target_cameras or camera_id in target_cameras:
-                                    # Analyze in context of task
-                                    task_result = await command_agent.analyze_with_context(
-                                        task_id,
-                                        {"camera_id": camera_id, "timestamp": datetime.utcnow().isoformat()},
-                                        analysis
-                                    )
-
-                                    # Send task update if alert needed
-                                    if task_result.get('alert_needed'):
-                                        await manager.send_system_message("task_alert", {
-                                            "task_id": task_id,
-                                            "camera_id": camera_id,
-                                            "task_type": task_command.get('task_type'),
-                                            "target": task_command.get('target'),
-                                            "findings": task_result.get('findings'),
-                                            "alert_message": task_result.get('alert_message'),
-                                            "timestamp": datetime.utcnow().isoformat()
-                                        })
-
-                                        # Also create an alert
-                                        task_alert = Alert(
-                                            event_id=event.id,
-                                            severity=AlertSeverity.WARNING,
-                                            title=f"Task Alert: {task_command.get('target', 'Unknown')}",
-                                            message=task_result.get('alert_message', 'Task condition met')
-                                        )
-                                        db.add(task_alert)
-                                        db.commit()
-
-                        except Exception as e:
-                            db.rollback()
-                            logger.error(f"Error storing event: {e}")
-                        finally:
-                            db.close()
-
-            # Wait before next iteration (based on FPS)
-            await asyncio.sleep(1.0 / settings.CAMERA_FPS)
+    try:
+        while True:
+            try:
+                # Start loops for new cameras; loops end on their own when
+                # their camera stops
+                _, active_camera_ids = camera_service.get_snapshot()
+                for camera_id in active_camera_ids:
+                    camera_task = camera_loops.get(camera_id)
+                    if camera_task is None or camera_task.done():
+                        camera_loops[camera_id] = asyncio.create_task(camera_loop(camera_id))
 
-        except Exception as e:
-            logger.error(f"Error in surveillance worker: {e}")
-            await asyncio.sleep(1)
+                for camera_id in [c for c, t in camera_loops.items() if t.done()]:
+                    del camera_loops[camera_id]
+
+                await asyncio.sleep(CAMERA_POLL_INTERVAL_SECONDS)
+
+            except Exception as e:
+                logger.error("Error in surveillance worker: {}", e)
+                await asyncio.sleep(1)
+
+    finally:
+        # Stop the camera loops along with the worker
+        for camera_task in camera_loops.values():
+            camera_task.cancel()
+        await asyncio.gather(*camera_loops.values(), return_exceptions=True)
 
 
 if __name__ == "__main__":
@@ -262,5 +501,11 @@ if __name__ == "__main__":
         host=settings.APP_HOST,
         port=settings.APP_PORT,
         reload=settings.DEBUG,
-        log_level=settings.LOG_LEVEL.lower()
+        workers=settings.WORKERS,
+        log_level=settings.LOG_LEVEL.lower(),
+        # uvloop is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        ws="websockets",
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE
     )
@@ -3,15 +3,26 @@ Camera Service - Manages camera connections and frame capture
 """
 import cv2
 import asyncio
+import threading
 import numpy as np
-from typing import Optional, AsyncGenerator, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, AsyncGenerator, Dict, Any, Tuple, Callable, TypeVar
 from datetime import datetime
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config import settings
+from config import settings, RUNTIME
+
+# libjpeg-turbo SIMD encoder, with cv2.imencode as the fallback
+try:
+    from turbojpeg import TurboJPEG
+    turbo_jpeg = TurboJPEG()
+except Exception:
+    turbo_jpeg = None
+
+T = TypeVar("T")
 
 
 class CameraService:
@@ -23,6 +34,61 @@ class CameraService:
         self.active_cameras: Dict[int, cv2.VideoCapture] = {}
         self.camera_configs: Dict[int, Dict[str, Any]] = {}
 
+        # Cached (count, camera_ids) view of active_cameras
+        self._snapshot: Tuple[int, Tuple[int, ...]] = (0, ())
+
+        # Latest (frame_seq, frame) per camera, written by capture threads
+        self._latest_frames: Dict[int, Tuple[int, np.ndarray]] = {}
+        self._capture_threads: Dict[int, Tuple[threading.Thread, threading.Event]] = {}
+
+        # Set on the event loop whenever a camera publishes a new frame
+        self._frame_events: Dict[int, asyncio.Event] = {}
+
+        # Dedicated pool for blocking OpenCV work; cv2 releases the GIL,
+        # so cameras are encoded in parallel
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.MAX_CAMERAS,
+            thread_name_prefix="cv2"
+        )
+
+    def _refresh_snapshot(self):
+        """
+        Rebuild the cached active camera snapshot
+        """
+        camera_ids = tuple(self.active_cameras)
+        self._snapshot = (len(camera_ids), camera_ids)
+
+    def _capture_loop(
+        self,
+        camera_id: int,
+        cap: cv2.VideoCapture,
+        stop_event: threading.Event,
+        frame_interval: float,
+        notify: Callable[[], None]
+    ):
+        """
+        Read frames on a background thread and publish the latest one
+
+        Args:
+            camera_id: Camera ID
+            cap: Opened video capture
+            stop_event: Set to stop the loop
+            frame_interval: Seconds between reads
+            notify: Called after each published frame
+        """
+        frame_seq = 0
+        while not stop_event.is_set():
+            try:
+                ret, frame = cap.read()
+                if ret:
+                    frame_seq += 1
+                    # Tuple swap is atomic; readers get the array without a copy
+                    self._latest_frames[camera_id] = (frame_seq, frame)
+                    notify()
+            except Exception as e:
+                print(f"Error capturing frame from camera {camera_id}: {e}")
+            stop_event.wait(frame_interval)
+
     async def initialize_camera(
         self,
         camera_id: int,
@@ -42,6 +108,9 @@ class CameraService:
         Returns:
             Success status
         """
+        if camera_id in self.active_cameras:
+            await self.stop_camera(camera_id)
+
         try:
             cap = cv2.VideoCapture(source)
 
@@ -64,6 +133,28 @@ class CameraService:
                 "resolution": resolution or (settings.VIDEO_RESOLUTION_WIDTH, settings.VIDEO_RESOLUTION_HEIGHT),
                 "initialized_at": datetime.utcnow()
             }
+            self._refresh_snapshot()
+
+            # Start background capture, waking frame waiters on the loop
+            loop = asyncio.get_running_loop()
+            frame_event = asyncio.Event()
+            self._frame_events[camera_id] = frame_event
+
+            stop_event = threading.Event()
+            thread = threading.Thread(
+                target=self._capture_loop,
+                args=(
+                    camera_id,
+                    cap,
+                    stop_event,
+                    1.0 / self.camera_configs[camera_id]['fps'],
+                    lambda: loop.call_soon_threadsafe(frame_event.set)
+                ),
+                name=f"camera-{camera_id}-capture",
+                daemon=True
+            )
+            self._capture_threads[camera_id] = (thread, stop_event)
+            thread.start()
 
             return True
 
@@ -71,9 +162,31 @@ class CameraService:
             print(f"Error initializing camera {camera_id}: {e}")
             return False
 
+    async def run_blocking(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking OpenCV call on the camera executor
+
+        Args:
+            func: Function to run
+            *args: Positional arguments for func
+
+        Returns:
+            Result of func
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def shutdown_executor(self):
+        """
+        Shut down the OpenCV executor without blocking the event loop
+
+        Call after the tasks using run_blocking are stopped. Queued calls
+        are cancelled and running ones finish in the background.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
     async def capture_frame(self, camera_id: int) -> Optional[np.ndarray]:
         """
-        Capture a single frame from camera
+        Get the latest captured frame from camera
 
         Args:
             camera_id: Camera ID
@@ -81,19 +194,53 @@ class CameraService:
         Returns:
             Frame as numpy array or None
         """
-        if camera_id not in self.active_cameras:
-            return None
+        return self.get_latest_frame(camera_id)[1]
 
-        cap = self.active_cameras[camera_id]
+    def get_latest_frame(self, camera_id: int) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Get the latest captured frame and its sequence number
 
-        try:
-            ret, frame = cap.read()
-            if ret:
-                return frame
-            return None
-        except Exception as e:
-            print(f"Error capturing frame from camera {camera_id}: {e}")
-            return None
+        The sequence number increases with every frame read, so callers
+        can skip frames they have already processed.
+
+        Args:
+            camera_id: Camera ID
+
+        Returns:
+            Tuple of (frame_seq, frame); (0, None) before the first frame
+        """
+        return self._latest_frames.get(camera_id, (0, None))
+
+    async def wait_for_frame(
+        self,
+        camera_id: int,
+        last_seq: int = 0
+    ) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Wait until the camera has a frame newer than last_seq
+
+        Only the latest frame is kept, so frames captured while the
+        caller was busy are skipped.
+
+        Args:
+            camera_id: Camera ID
+            last_seq: Sequence number of the last frame the caller handled
+
+        Returns:
+            Tuple of (frame_seq, frame); (0, None) once the camera is stopped
+        """
+        while True:
+            # stop_camera removes the event, a restart replaces it
+            frame_event = self._frame_events.get(camera_id)
+            if frame_event is None:
+                return 0, None
+
+            # Clear before reading so a frame published in between still wakes us
+            frame_event.clear()
+            frame_seq, frame = self.get_latest_frame(camera_id)
+            if frame is not None and frame_seq != last_seq:
+                return frame_seq, frame
+            await frame_event.wait()
 
     async def stream_frames(
         self,
@@ -166,9 +313,23 @@ class CameraService:
             return False
 
         try:
+            # Stop background capture before releasing the device
+            capture = self._capture_threads.pop(camera_id, None)
+            if capture is not None:
+                thread, stop_event = capture
+                stop_event.set()
+                await asyncio.to_thread(thread.join)
+            self._latest_frames.pop(camera_id, None)
+
             self.active_cameras[camera_id].release()
             del self.active_cameras[camera_id]
             del self.camera_configs[camera_id]
+            self._refresh_snapshot()
+
+            # Wake anyone waiting for a frame so they see the camera is gone
+            frame_event = self._frame_events.pop(camera_id, None)
+            if frame_event is not None:
+                frame_event.set()
             return True
         except Exception as e:
             print(f"Error stopping camera {camera_id}: {e}")
@@ -178,10 +339,100 @@ class CameraService:
         """
         Stop all active cameras
         """
-        camera_ids = list(self.active_cameras.keys())
+        _, camera_ids = self.get_snapshot()
         for camera_id in camera_ids:
             await self.stop_camera(camera_id)
 
+    def encode_jpeg(self, frame: np.ndarray, quality: int = 75) -> bytes:
+        """
+        Encode a BGR frame as JPEG
+
+        Blocking; call through run_blocking from async code.
+
+        Args:
+            frame: Video frame (numpy array)
+            quality: JPEG quality (0-100)
+
+        Returns:
+            JPEG bytes
+        """
+        if turbo_jpeg is not None:
+            return turbo_jpeg.encode(frame, quality=quality)
+
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return buffer.tobytes()
+
+    @staticmethod
+    def frame_hash(frame: np.ndarray) -> int:
+        """
+        Compute a 64-bit difference hash (dHash) of a frame
+
+        Similar frames give hashes with a small Hamming distance, which
+        makes this a cheap scene-change check.
+
+        Args:
+            frame: Video frame (numpy array)
+
+        Returns:
+            Hash as an unsigned 64-bit integer
+        """
+        small = cv2.resize(frame, (9, 8), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        diff = gray[:, 1:] > gray[:, :-1]
+        return int(np.packbits(diff).view(np.uint64)[0])
+
+    def encode_preview(self, frame: np.ndarray) -> bytes:
+        """
+        Downscale a frame to the preview resolution and encode it as JPEG
+
+        Blocking; call through run_blocking from async code.
+
+        Args:
+            frame: Video frame (numpy array)
+
+        Returns:
+            JPEG bytes
+        """
+        frame = self.downscale(frame, RUNTIME.PREVIEW_WIDTH, RUNTIME.PREVIEW_HEIGHT)
+        return self.encode_jpeg(frame, quality=RUNTIME.PREVIEW_JPEG_QUALITY)
+
+    @staticmethod
+    def downscale(frame: np.ndarray, width: int, height: int) -> np.ndarray:
+        """
+        Shrink a frame to fit within the given size, keeping its aspect ratio
+
+        Frames that already fit are returned as is.
+
+        Args:
+            frame: Video frame (numpy array)
+            width: Maximum width
+            height: Maximum height
+
+        Returns:
+            Resized frame
+        """
+        frame_height, frame_width = frame.shape[:2]
+        scale = min(width / frame_width, height / frame_height)
+        if scale >= 1:
+            return frame
+        size = (max(1, round(frame_width * scale)), max(1, round(frame_height * scale)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def prepare_for_analysis(self, frame: np.ndarray) -> Tuple[np.ndarray, int]:
+        """
+        Downscale a frame to the analysis resolution and hash it
+
+        Blocking; call through run_blocking from async code.
+
+        Args:
+            frame: Full-resolution video frame (numpy array)
+
+        Returns:
+            Tuple of (analysis frame, dHash)
+        """
+        frame = self.downscale(frame, RUNTIME.ANALYSIS_WIDTH, RUNTIME.ANALYSIS_HEIGHT)
+        return frame, self.frame_hash(frame)
+
     def get_active_camera_count(self) -> int:
         """
         Get number of active cameras
@@ -189,7 +440,16 @@ class CameraService:
         Returns:
             Number of active cameras
         """
-        return len(self.active_cameras)
+        return self._snapshot[0]
+
+    def get_snapshot(self) -> Tuple[int, Tuple[int, ...]]:
+        """
+        Get active camera count and IDs without copying active_cameras
+
+        Returns:
+            Tuple of (count, camera_ids)
+        """
+        return self._snapshot
 
     async def test_camera_source(self, source: Any) -> bool:
         """
@@ -1,7 +1,7 @@
 /**
  * Main Application Component
  */
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Camera, Alert, SummaryStats } from './types';
 import { cameraApi, alertApi, statsApi } from './services/api';
 import wsService from './services/websocket';
@@ -29,6 +29,10 @@ function App() {
   const [narrations, setNarrations] = useState<NarrationEntry[]>([]);
   const [activeTab, setActiveTab] = useState('dashboard');
 
+  // Object URLs created for live feed frames, and the newest per camera
+  const frameUrlsRef = useRef<Set<string>>(new Set());
+  const latestFrameUrlRef = useRef<Map<number, string>>(new Map());
+
   // Load initial data
   useEffect(() => {
     loadCameras();
@@ -45,10 +49,15 @@ function App() {
   useEffect(() => {
     // Connect to live feed
     wsService.connectLiveFeed((update) => {
+      const frameUrl = URL.createObjectURL(new Blob([update.frame], { type: 'image/jpeg' }));
+
+      frameUrlsRef.current.add(frameUrl);
+      latestFrameUrlRef.current.set(update.camera_id, frameUrl);
+
       setLiveFeedData((prev) => {
         const newMap = new Map(prev);
         newMap.set(update.camera_id, {
-          frame: update.frame,
+          frame: frameUrl,
           timestamp: update.timestamp
         });
         return newMap;
@@ -90,6 +99,27 @@ function App() {
     };
   }, []);
 
+  // Revoke frame URLs once a render no longer shows them
+  useEffect(() => {
+    const shown = new Set(Array.from(liveFeedData.values(), (data) => data.frame));
+    const latest = new Set(latestFrameUrlRef.current.values());
+    frameUrlsRef.current.forEach((url) => {
+      if (!shown.has(url) && !latest.has(url)) {
+        URL.revokeObjectURL(url);
+        frameUrlsRef.current.delete(url);
+      }
+    });
+  }, [liveFeedData]);
+
+  // Revoke any remaining frame URLs on unmount
+  useEffect(() => {
+    const frameUrls = frameUrlsRef.current;
+    return () => {
+      frameUrls.forEach((url) => URL.revokeObjectURL(url));
+      frameUrls.clear();
+    };
+  }, []);
+
   const loadCameras = async () => {
     try {
       const data = await cameraApi.getAll();
@@ -129,6 +159,7 @@ function App() {
   const handleCameraStop = async (cameraId: number) => {
     try {
       await cameraApi.stop(cameraId);
+      latestFrameUrlRef.current.delete(cameraId);
       setLiveFeedData((prev) => {
         const newMap = new Map(prev);
         newMap.delete(cameraId);
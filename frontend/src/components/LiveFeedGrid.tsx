@@ -6,7 +6,7 @@ import { Camera } from '../types';
 
 interface LiveFeedGridProps {
   cameras: Camera[];
-  liveFeedData: Map<number, { frame: string; timestamp: string }>;
+  liveFeedData: Map<number, { frame: string; timestamp: string }>; // frame is an object URL
   onCameraStart: (cameraId: number) => void;
   onCameraStop: (cameraId: number) => void;
 }
@@ -57,7 +57,7 @@ const LiveFeedGrid: React.FC<LiveFeedGridProps> = ({
               <div className="relative aspect-video bg-dark-900">
                 {feedData?.frame ? (
                   <img
-                    src={`data:image/jpeg;base64,${feedData.frame}`}
+                    src={feedData.frame}
                     alt={`Feed from ${camera.name}`}
                     className="w-full h-full object-cover"
                   />
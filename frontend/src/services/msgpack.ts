@@ -0,0 +1,116 @@
+/**
+ * Minimal MessagePack decoder for binary WebSocket channels
+ *
+ * Covers everything the backend's msgpack.packb emits (nil, booleans,
+ * integers, floats, strings, binary, arrays and maps). Binary values are
+ * returned as Uint8Array views into the received buffer.
+ */
+
+const textDecoder = new TextDecoder();
+
+class Decoder {
+  private view: DataView;
+  private bytes: Uint8Array;
+  private pos = 0;
+
+  constructor(bytes: Uint8Array) {
+    this.bytes = bytes;
+    this.view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  }
+
+  decode(): unknown {
+    const value = this.read();
+    if (this.pos !== this.bytes.byteLength) {
+      throw new Error('Extra bytes after MessagePack value');
+    }
+    return value;
+  }
+
+  private read(): unknown {
+    const type = this.uint8();
+
+    if (type <= 0x7f) return type; // positive fixint
+    if (type >= 0xe0) return type - 0x100; // negative fixint
+    if ((type & 0xf0) === 0x80) return this.map(type & 0x0f);
+    if ((type & 0xf0) === 0x90) return this.array(type & 0x0f);
+    if ((type & 0xe0) === 0xa0) return this.str(type & 0x1f);
+
+    switch (type) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xc4: return this.bin(this.uint8());
+      case 0xc5: return this.bin(this.uint16());
+      case 0xc6: return this.bin(this.uint32());
+      case 0xca: return this.advance(4, (offset) => this.view.getFloat32(offset));
+      case 0xcb: return this.advance(8, (offset) => this.view.getFloat64(offset));
+      case 0xcc: return this.uint8();
+      case 0xcd: return this.uint16();
+      case 0xce: return this.uint32();
+      case 0xcf: return this.advance(8, (offset) => Number(this.view.getBigUint64(offset)));
+      case 0xd0: return this.advance(1, (offset) => this.view.getInt8(offset));
+      case 0xd1: return this.advance(2, (offset) => this.view.getInt16(offset));
+      case 0xd2: return this.advance(4, (offset) => this.view.getInt32(offset));
+      case 0xd3: return this.advance(8, (offset) => Number(this.view.getBigInt64(offset)));
+      case 0xd9: return this.str(this.uint8());
+      case 0xda: return this.str(this.uint16());
+      case 0xdb: return this.str(this.uint32());
+      case 0xdc: return this.array(this.uint16());
+      case 0xdd: return this.array(this.uint32());
+      case 0xde: return this.map(this.uint16());
+      case 0xdf: return this.map(this.uint32());
+      default:
+        throw new Error(`Unsupported MessagePack type 0x${type.toString(16)}`);
+    }
+  }
+
+  private advance<T>(size: number, read: (offset: number) => T): T {
+    if (this.pos + size > this.bytes.byteLength) {
+      throw new Error('Truncated MessagePack data');
+    }
+    const value = read(this.pos);
+    this.pos += size;
+    return value;
+  }
+
+  private uint8(): number {
+    return this.advance(1, (offset) => this.view.getUint8(offset));
+  }
+
+  private uint16(): number {
+    return this.advance(2, (offset) => this.view.getUint16(offset));
+  }
+
+  private uint32(): number {
+    return this.advance(4, (offset) => this.view.getUint32(offset));
+  }
+
+  private bin(length: number): Uint8Array {
+    return this.advance(length, (offset) => this.bytes.subarray(offset, offset + length));
+  }
+
+  private str(length: number): string {
+    return textDecoder.decode(this.bin(length));
+  }
+
+  private array(length: number): unknown[] {
+    const items = new Array(length);
+    for (let i = 0; i < length; i++) {
+      items[i] = this.read();
+    }
+    return items;
+  }
+
+  private map(length: number): Record<string, unknown> {
+    const result: Record<string, unknown> = {};
+    for (let i = 0; i < length; i++) {
+      const key = this.read();
+      result[String(key)] = this.read();
+    }
+    return result;
+  }
+}
+
+export function decode(bytes: Uint8Array): unknown {
+  return new Decoder(bytes).decode();
+}
@@ -1,6 +1,7 @@
 /**
  * WebSocket service for real-time communication
  */
+import { decode } from './msgpack';
 import { WebSocketMessage, Alert, LiveFeedUpdate, AnalysisUpdate } from '../types';
 
 const WS_BASE_URL = process.env.REACT_APP_WS_URL || 'ws://localhost:8000';
@@ -24,6 +25,8 @@ class WebSocketService {
     }
 
     const ws = new WebSocket(`${WS_BASE_URL}${endpoint}`);
+    // Binary channels (e.g. live feed) are msgpack-encoded
+    ws.binaryType = 'arraybuffer';
 
     ws.onopen = () => {
       console.log(`WebSocket connected to ${endpoint}`);
@@ -32,7 +35,9 @@ class WebSocketService {
 
     ws.onmessage = (event) => {
       try {
-        const message: WebSocketMessage = JSON.parse(event.data);
+        const message: WebSocketMessage = typeof event.data === 'string'
+          ? JSON.parse(event.data)
+          : decode(new Uint8Array(event.data)) as WebSocketMessage;
 
         // Call registered handlers
         const handlers = this.handlers.get(endpoint);
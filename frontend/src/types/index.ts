@@ -70,7 +70,7 @@ export interface LiveFeedUpdate {
   type: "live_feed_update";
   camera_id: number;
   timestamp: string;
-  frame: string; // Base64 encoded
+  frame: Uint8Array; // JPEG bytes
   analysis: {
     scene_description: string;
     detections: Detection[];